@@ -39,6 +39,7 @@ Currently it supports git, hg, svn and bzr.',
             'vcs = vcstool.commands.vcs:main',
             'vcs-branch = vcstool.commands.branch:main',
             'vcs-bzr = vcstool.commands.custom:bzr_main',
+            'vcs-compare = vcstool.commands.compare:main',
             'vcs-custom = vcstool.commands.custom:main',
             'vcs-diff = vcstool.commands.diff:main',
             'vcs-export = vcstool.commands.export:main',
@@ -56,6 +56,17 @@ class TestCommands(unittest.TestCase):
         expected = get_expected_output('branch')
         self.assertEqual(output, expected)
 
+    def test_compare(self):
+        output = run_command(
+            'compare', ['--input', REPOS_FILE, '--format', 'plain'])
+        expected = get_expected_output('compare_plain')
+        self.assertEqual(output, expected)
+
+        output = run_command(
+            'compare', ['--input', REPOS_FILE, '--format', 'json'])
+        expected = get_expected_output('compare_json')
+        self.assertEqual(output, expected)
+
     def test_custom(self):
         output = run_command(
             'custom',
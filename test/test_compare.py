@@ -0,0 +1,121 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from vcstool.commands.compare import CompareOutput  # noqa: E402
+from vcstool.commands.compare import CompareOutputEntry  # noqa: E402
+from vcstool.commands.compare import CompareTable  # noqa: E402
+from vcstool.commands.compare import get_status  # noqa: E402
+from vcstool.commands.compare import HASH_MAX_LENGTH  # noqa: E402
+from vcstool.commands.compare import MissingManifestEntry  # noqa: E402
+
+HASH = '377d5b3d03c212f015cc832fdb368f4534d0d583'
+
+
+def get_entry(
+    path='repo', manifest_version='master', local_version='master',
+    local_hash=HASH, remote_version='origin/master', remote_hash=HASH,
+    ahead=0, behind=0, dirty=False, in_manifest=True
+):
+    return CompareOutputEntry(path, manifest_version, CompareOutput(
+        local_version=local_version, local_hash=local_hash,
+        remote_version=remote_version, remote_hash=remote_hash,
+        ahead=ahead, behind=behind, dirty=dirty), in_manifest=in_manifest)
+
+
+def get_table(entries, display_width, only_changed=False):
+    # narrow the table deterministically instead of relying on the size of
+    # the terminal running the tests
+    get_width = CompareTable._get_default_display_width
+    CompareTable._get_default_display_width = \
+        staticmethod(lambda: display_width)
+    try:
+        return str(CompareTable(entries, only_changed=only_changed))
+    finally:
+        CompareTable._get_default_display_width = get_width
+
+
+class TestCompareTable(unittest.TestCase):
+
+    def test_wide_table_keeps_full_hashes(self):
+        table = get_table({'repo': get_entry()}, 200)
+        self.assertIn(HASH, table)
+        self.assertIn('Remote', table)
+
+    def test_narrow_table_abbreviates_hashes(self):
+        table = get_table({'repo': get_entry()}, 80)
+        self.assertNotIn(HASH, table)
+        self.assertIn(HASH[:HASH_MAX_LENGTH], table)
+        self.assertIn('Remote', table)
+
+    def test_narrower_table_hides_columns(self):
+        table = get_table({'repo': get_entry()}, 40)
+        self.assertNotIn('Remote', table)
+        self.assertNotIn('Local', table)
+        self.assertIn('Repository', table)
+        self.assertIn('Manifest', table)
+
+    def test_unversioned_manifest_entry_is_tracked(self):
+        # a manifest entry without a version key is tracked, not untracked
+        entries = {'on_master': get_entry(
+            path='on_master', manifest_version=None)}
+        table = get_table(entries, 200)
+        self.assertNotIn('?', table)
+        table = get_table(entries, 200, only_changed=True)
+        self.assertNotIn('on_master', table)
+
+    def test_repository_not_in_manifest(self):
+        entries = {'extra': get_entry(
+            path='extra', manifest_version=None, in_manifest=False)}
+        table = get_table(entries, 200)
+        self.assertIn('?', table)
+        table = get_table(entries, 200, only_changed=True)
+        self.assertIn('extra', table)
+
+    def test_only_changed_filters_nominal_entries(self):
+        entries = {
+            'current': get_entry(path='current'),
+            'behind': get_entry(path='behind', behind=2),
+            'missing': MissingManifestEntry('missing', 'master'),
+        }
+        table = get_table(entries, 200, only_changed=True)
+        self.assertNotIn('current', table)
+        self.assertIn('behind', table)
+        self.assertIn('missing', table)
+
+
+class TestGetStatus(unittest.TestCase):
+
+    def test_missing_repository(self):
+        self.assertEqual(get_status(None, 'master'), 'M')
+
+    def test_unsupported_client(self):
+        entry = {'returncode': NotImplemented, 'output': ''}
+        self.assertEqual(get_status(entry, 'master'), 's')
+
+    def test_failed_command(self):
+        entry = {'returncode': 1, 'output': 'error'}
+        self.assertEqual(get_status(entry, 'master'), 'E')
+
+    def test_branch_matches_manifest(self):
+        entry = {'returncode': 0, 'output': 'master'}
+        self.assertEqual(get_status(entry, 'master'), '=')
+
+    def test_hash_matches_manifest(self):
+        # pinned to a hash the repository is checked out detached
+        entry = {
+            'returncode': 0, 'output': 'HEAD',
+            'compare_data': {'local_hash': HASH}}
+        self.assertEqual(get_status(entry, HASH), '=')
+
+    def test_version_differs(self):
+        entry = {
+            'returncode': 0, 'output': 'develop',
+            'compare_data': {'local_hash': HASH}}
+        self.assertEqual(get_status(entry, 'master'), '~')
+
+
+if __name__ == '__main__':
+    unittest.main()
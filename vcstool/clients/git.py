@@ -46,6 +46,73 @@ class GitClient(VcsClientBase):
 
         return result
 
+    def compare(self, _command):
+        self._check_executable()
+        # currently checked out reference ('HEAD' when detached)
+        cmd_branch = [
+            GitClient._executable, 'rev-parse', '--abbrev-ref', 'HEAD']
+        result_branch = self._run_command(cmd_branch)
+        if result_branch['returncode']:
+            return result_branch
+        branch = result_branch['output']
+
+        cmd_hash = [GitClient._executable, 'rev-parse', 'HEAD']
+        result_hash = self._run_command(cmd_hash)
+        if result_hash['returncode']:
+            return result_hash
+        local_hash = result_hash['output']
+
+        cmd_status = [GitClient._executable, 'status', '--porcelain']
+        result_status = self._run_command(cmd_status)
+        if result_status['returncode']:
+            return result_status
+        dirty = bool(result_status['output'])
+
+        cmds = [
+            result_branch['cmd'], result_hash['cmd'], result_status['cmd']]
+        remote_version = None
+        remote_hash = None
+        ahead = 0
+        behind = 0
+        # tracking information is only available with an upstream branch
+        cmd_upstream = [
+            GitClient._executable, 'rev-parse', '--abbrev-ref', '@{upstream}']
+        result_upstream = self._run_command(cmd_upstream)
+        cmds.append(result_upstream['cmd'])
+        if not result_upstream['returncode']:
+            remote_version = result_upstream['output']
+            cmd_remote_hash = [
+                GitClient._executable, 'rev-parse', '@{upstream}']
+            result_remote_hash = self._run_command(cmd_remote_hash)
+            if result_remote_hash['returncode']:
+                return result_remote_hash
+            remote_hash = result_remote_hash['output']
+            cmd_count = [
+                GitClient._executable, 'rev-list', '--left-right', '--count',
+                '@{upstream}...HEAD']
+            result_count = self._run_command(cmd_count)
+            if result_count['returncode']:
+                return result_count
+            behind, ahead = [
+                int(x) for x in result_count['output'].split()]
+            cmds += [result_remote_hash['cmd'], result_count['cmd']]
+
+        return {
+            'cmd': ' && '.join(cmds),
+            'cwd': self.path,
+            'output': branch,
+            'returncode': 0,
+            'compare_data': {
+                'local_version': branch,
+                'local_hash': local_hash,
+                'remote_version': remote_version,
+                'remote_hash': remote_hash,
+                'ahead': ahead,
+                'behind': behind,
+                'dirty': dirty,
+            },
+        }
+
     def custom(self, command):
         self._check_executable()
         cmd = [GitClient._executable] + command.args
@@ -66,9 +66,12 @@ def run_command(cmd, cwd, env=None):
         cwd = None
     result = {'cmd': ' '.join(cmd), 'cwd': cwd}
     try:
+        # close_fds=False avoids walking the whole fd table for every
+        # spawned vcs process and lets CPython use posix_spawn, the pipes
+        # created by Popen itself are non-inheritable anyway
         proc = subprocess.Popen(
             cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-            env=env)
+            env=env, close_fds=False)
         output, _ = proc.communicate()
         result['output'] = output.rstrip().decode('utf8')
         result['returncode'] = proc.returncode
@@ -0,0 +1,835 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
+from functools import lru_cache
+import json
+import os
+import re
+import string
+import sys
+
+from vcstool.crawler import find_repositories
+from vcstool.executor import ansi
+from vcstool.executor import execute_jobs_iter
+from vcstool.executor import generate_jobs
+from vcstool.executor import output_repositories
+from vcstool.streams import set_streams
+
+from .command import add_common_arguments
+from .command import Command
+from .import_ import get_repositories
+
+ANSI_RE = re.compile('\x1b\\[[0-9;]*m')
+
+
+def visible_len(cell):
+    # the regex is only needed when escape sequences are involved
+    return len(ANSI_RE.sub('', cell)) if '\x1b' in cell else len(cell)
+
+
+HASH_MAX_LENGTH = 8
+
+_ACCEPTABLE_BRANCHES = frozenset({
+    'master', 'develop', 'azevtec', 'outrider'})
+_BRANCH_PREFIXES = (
+    'bugfix/', 'demo/', 'feature/', 'hotfix/', 'release/')
+
+
+class CompareCommand(Command):
+
+    command = 'compare'
+    help = 'Compare working copies to the repository list'
+
+    def __init__(self, args):
+        super(CompareCommand, self).__init__(args)
+
+
+_parser = None
+
+
+def get_parser():
+    # building an ArgumentParser is not free, reuse it when main() is
+    # invoked repeatedly from a wrapper or from tests
+    global _parser
+    if _parser is None:
+        _parser = _build_parser()
+    return _parser
+
+
+def _build_parser():
+    parser = argparse.ArgumentParser(
+        description='Compare working copies to the repository list',
+        prog='vcs compare')
+    group = parser.add_argument_group('"compare" command parameters')
+    group.add_argument(
+        '--input', type=argparse.FileType('r'), default=None,
+        help='Where to read YAML from, defaults to the single .repos file '
+             'in the base path', metavar='FILE')
+    group.add_argument(
+        '--format', choices=['table', 'plain', 'json'], default='table',
+        help='Output format')
+    group.add_argument(
+        '--only-changed', action='store_true', default=False,
+        help='Only list repositories which differ from the repository list '
+             'or their upstream')
+    add_common_arguments(
+        parser, skip_hide_empty=True, skip_nested=True, path_nargs='?')
+    return parser
+
+
+class RepoStatus(IntEnum):
+    NOMINAL = 0
+    UNTRACKED = 1
+
+
+class VcsTrackingStatus(IntEnum):
+    EQUAL = 0
+    AHEAD = 1
+    BEHIND = 2
+    DIVERGED = 3
+    NO_UPSTREAM = 4
+    ERROR = 5
+
+
+class Colors:
+
+    RESET = ansi('reset')
+    BACKGROUND_ODD = ansi('brightblackb')
+    REPO_STATUS_NOMINAL = ansi('brightblackf')
+    REPO_STATUS_UNTRACKED = ansi('yellowf')
+    MISSING = ansi('redf')
+    UNSUPPORTED = ansi('yellowf')
+    ERROR = ansi('redf')
+    DIRTY = ansi('magentaf')
+    BRANCH_OK = ansi('greenf')
+    BRANCH_UNUSUAL = ansi('yellowf')
+    DETACHED = ansi('redf')
+    TRACK_EQUAL = ansi('greenf')
+    TRACK_AHEAD = ansi('cyanf')
+    TRACK_BEHIND = ansi('cyanf')
+    TRACK_DIVERGED = ansi('magentaf')
+    TRACK_NO_UPSTREAM = ansi('yellowf')
+    VERSION_CURRENT = ansi('greenf')
+    VERSION_DIFFERS = ansi('redf')
+    VERSION_DEFAULT = ''
+    REMOTE = ansi('brightblackf')
+
+
+class Legend:
+
+    REPO = 'r'
+    REPO_NOT_TRACKED = '?'
+    MISSING = 'M'
+    UNSUPPORTED = 's'
+    ERROR = 'E'
+    DIRTY = '*'
+    EQUAL = '='
+    AHEAD = '>'
+    BEHIND = '<'
+    DIVERGED = '<>'
+    NO_UPSTREAM = '~'
+    DETACHED = '#'
+
+    STATUS_SYMBOLS = (
+        REPO, REPO_NOT_TRACKED, MISSING, UNSUPPORTED, ERROR, DIRTY)
+    TRACK_SYMBOLS = (EQUAL, AHEAD, BEHIND, DIVERGED, NO_UPSTREAM, DETACHED)
+
+    # built once at import time, get_symbol_description used to assemble
+    # this mapping again on every call
+    _DESCRIPTIONS = {
+        REPO: "'%s' tracked repository" % REPO,
+        REPO_NOT_TRACKED:
+            "'%s' repository not in the list" % REPO_NOT_TRACKED,
+        MISSING: "'%s' missing repository" % MISSING,
+        UNSUPPORTED:
+            "'%s' client does not support compare" % UNSUPPORTED,
+        ERROR: "'%s' error" % ERROR,
+        DIRTY: "'%s' dirty working tree" % DIRTY,
+        EQUAL: "'%s' equal to upstream" % EQUAL,
+        AHEAD: "'%sN' N commits ahead of upstream" % AHEAD,
+        BEHIND: "'%sN' N commits behind upstream" % BEHIND,
+        DIVERGED: "'%s' diverged from upstream" % DIVERGED,
+        NO_UPSTREAM: "'%s' no upstream configured" % NO_UPSTREAM,
+        DETACHED: "'%s' detached HEAD" % DETACHED,
+    }
+
+    @classmethod
+    def get_symbol_description(cls, symbol):
+        return cls._DESCRIPTIONS[symbol]
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def get_legend(cls, symbols):
+        # only the two class level symbol tuples are ever passed
+        return 'Legend: ' + '  '.join(
+            cls._DESCRIPTIONS[symbol] for symbol in symbols)
+
+
+# color, symbol and reset combined once at import time so the color
+# methods hand out finished strings instead of assembling them per cell
+# the enums are dense ints starting at zero, so indexing a tuple with the
+# enum value replaces dict hashing on the dispatch path
+_STATUS_STR = (
+    # RepoStatus.NOMINAL
+    Colors.REPO_STATUS_NOMINAL + Legend.REPO + Colors.RESET,
+    # RepoStatus.UNTRACKED
+    Colors.REPO_STATUS_UNTRACKED + Legend.REPO_NOT_TRACKED + Colors.RESET,
+)
+_STATUS_DIRTY_STR = (
+    # RepoStatus.NOMINAL
+    Colors.REPO_STATUS_NOMINAL + Legend.REPO +
+    Colors.DIRTY + Legend.DIRTY + Colors.RESET,
+    # RepoStatus.UNTRACKED
+    Colors.REPO_STATUS_UNTRACKED + Legend.REPO_NOT_TRACKED +
+    Colors.DIRTY + Legend.DIRTY + Colors.RESET,
+)
+_TRACK_TEMPLATE = (
+    # VcsTrackingStatus.EQUAL
+    Colors.TRACK_EQUAL + Legend.EQUAL + Colors.RESET,
+    # VcsTrackingStatus.AHEAD
+    Colors.TRACK_AHEAD + Legend.AHEAD + '%d' + Colors.RESET,
+    # VcsTrackingStatus.BEHIND
+    Colors.TRACK_BEHIND + Legend.BEHIND + '%d' + Colors.RESET,
+    # VcsTrackingStatus.DIVERGED
+    Colors.TRACK_DIVERGED + Legend.BEHIND + '%d ' +
+    Legend.AHEAD + '%d' + Colors.RESET,
+    # VcsTrackingStatus.NO_UPSTREAM
+    Colors.TRACK_NO_UPSTREAM + Legend.NO_UPSTREAM + Colors.RESET,
+    # VcsTrackingStatus.ERROR
+    Colors.ERROR + Legend.ERROR + Colors.RESET,
+)
+_MISSING_STR = Colors.MISSING + Legend.MISSING + Colors.RESET
+_UNSUPPORTED_STR = Colors.UNSUPPORTED + Legend.UNSUPPORTED + Colors.RESET
+_ERROR_STR = Colors.ERROR + Legend.ERROR + Colors.RESET
+_DETACHED_STR = Colors.DETACHED + Legend.DETACHED + Colors.RESET
+
+
+def is_probably_a_hash(version):
+    # full or abbreviated sha1, at least seven hex digits
+    return (
+        7 <= len(version) <= 40 and
+        all(c in string.hexdigits for c in version))
+
+
+class CompareOutput(object):
+
+    def __init__(
+        self, local_version, local_hash, remote_version, remote_hash, ahead,
+        behind, dirty
+    ):
+        self.local_version = local_version
+        self.local_hash = local_hash
+        self.remote_version = remote_version
+        self.remote_hash = remote_hash
+        self.ahead = ahead
+        self.behind = behind
+        self.dirty = dirty
+
+
+def _precompute_hidden_columns(headers, hide_order):
+    # resolve the hide order to concrete column indices once so hiding n
+    # columns is a couple of list deletions instead of repeated searches
+    hide_indices = []
+    headers_by_hide_count = []
+    for count in range(len(hide_order) + 1):
+        hidden = hide_order[:count]
+        hide_indices.append(sorted(
+            (headers.index(header) for header in hidden), reverse=True))
+        headers_by_hide_count.append(
+            [header for header in headers if header not in hidden])
+    hide_order_indices = tuple(
+        headers.index(header) for header in hide_order)
+    return hide_indices, headers_by_hide_count, hide_order_indices
+
+
+class ICompareTableEntry(object):
+
+    HEADERS = [
+        'S', 'Repository', 'Branch', 'Track', 'Local', 'Manifest', 'Remote']
+    HEADER_HIDE_ORDER = ['Remote', 'Local', 'Track', 'Branch']
+    MAX_HIDE_COLUMNS = len(HEADER_HIDE_ORDER)
+    HIDE_INDICES, HEADERS_BY_HIDE_COUNT, HIDE_ORDER_INDICES = \
+        _precompute_hidden_columns(HEADERS, HEADER_HIDE_ORDER)
+
+    @classmethod
+    def get_headers(cls, cols_to_hide):
+        return list(cls.HEADERS_BY_HIDE_COUNT[cols_to_hide])
+
+    @classmethod
+    def _hide_n_columns(cls, row, count):
+        # indices are sorted descending so the deletions do not shift the
+        # positions still to be deleted
+        for index in cls.HIDE_INDICES[count]:
+            del row[index]
+        return row
+
+    @staticmethod
+    def _measure_row(row):
+        # measure each cell once when the row is built so neither the width
+        # probing nor the rendering has to strip escape sequences again
+        return [(cell, visible_len(cell)) for cell in row]
+
+    @property
+    def path(self):
+        return self._path
+
+    def is_significant(self):
+        return True
+
+    def get_color_row(self, cols_to_hide=0, abbreviate=False):
+        # the color cells are expensive to build compared to hiding a few
+        # columns, keep one measured row per abbreviation state so the
+        # layout probes and the final render share it
+        row = self._row_cache.get(abbreviate)
+        if row is None:
+            row = self._measure_row(self._build_color_row(abbreviate))
+            self._row_cache[abbreviate] = row
+        if cols_to_hide:
+            return self._hide_n_columns(list(row), cols_to_hide)
+        return row
+
+    def _build_color_row(self, abbreviate):
+        raise NotImplementedError()
+
+
+class CompareOutputEntry(ICompareTableEntry):
+
+    def __init__(
+        self, path, manifest_version, compare_output, in_manifest=True
+    ):
+        self._path = path
+        self._row_cache = {}
+        self._manifest_version = \
+            str(manifest_version) if manifest_version is not None else None
+        self._compare_output = compare_output
+        # a manifest entry may omit the version key, so membership is
+        # passed in separately instead of being derived from the version
+        self._repo_status = \
+            RepoStatus.NOMINAL if in_manifest else RepoStatus.UNTRACKED
+        self._tracking_status = self._get_tracking_status(compare_output)
+        # several color methods consult these for every rendered row, the
+        # answers only depend on data fixed at construction time
+        self._manifest_is_hash = \
+            is_probably_a_hash(self._manifest_version) \
+            if self._manifest_version else False
+        self._local_hash_short = \
+            compare_output.local_hash[:HASH_MAX_LENGTH] \
+            if is_probably_a_hash(compare_output.local_hash) \
+            else compare_output.local_hash
+        remote_hash = compare_output.remote_hash
+        if remote_hash is not None and is_probably_a_hash(remote_hash):
+            remote_hash = remote_hash[:HASH_MAX_LENGTH]
+        self._remote_hash_short = remote_hash
+        self._local_branch_valid = \
+            self._is_valid_branch_name(compare_output.local_version)
+        self._is_local_current_with_manifest = \
+            self._manifest_version is not None and \
+            self._manifest_version in {
+                compare_output.local_version, compare_output.local_hash}
+
+    @staticmethod
+    def _get_tracking_status(compare_output):
+        if compare_output.remote_version is None:
+            return VcsTrackingStatus.NO_UPSTREAM
+        if compare_output.ahead and compare_output.behind:
+            return VcsTrackingStatus.DIVERGED
+        if compare_output.ahead:
+            return VcsTrackingStatus.AHEAD
+        if compare_output.behind:
+            return VcsTrackingStatus.BEHIND
+        return VcsTrackingStatus.EQUAL
+
+    @staticmethod
+    def _is_valid_branch_name(branch_name):
+        # startswith with a tuple runs all prefix checks in C
+        return branch_name in _ACCEPTABLE_BRANCHES or \
+            branch_name.startswith(_BRANCH_PREFIXES)
+
+    def is_significant(self):
+        return (
+            self._repo_status != RepoStatus.NOMINAL or
+            self._compare_output.dirty or
+            self._tracking_status != VcsTrackingStatus.EQUAL or
+            (self._manifest_version is not None and
+                not self._is_local_current_with_manifest))
+
+    def get_color_repo_status(self):
+        symbols = _STATUS_DIRTY_STR if self._compare_output.dirty \
+            else _STATUS_STR
+        return symbols[self._repo_status]
+
+    def get_color_branch(self):
+        branch = self._compare_output.local_version
+        if branch == 'HEAD':
+            return _DETACHED_STR
+        color = Colors.BRANCH_OK if self._local_branch_valid \
+            else Colors.BRANCH_UNUSUAL
+        return color + branch + Colors.RESET
+
+    def get_color_track(self):
+        template = _TRACK_TEMPLATE[self._tracking_status]
+        if self._tracking_status == VcsTrackingStatus.AHEAD:
+            return template % self._compare_output.ahead
+        if self._tracking_status == VcsTrackingStatus.BEHIND:
+            return template % self._compare_output.behind
+        if self._tracking_status == VcsTrackingStatus.DIVERGED:
+            return template % (
+                self._compare_output.behind, self._compare_output.ahead)
+        return template
+
+    def get_color_local_version(self, abbreviate):
+        local_hash = self._local_hash_short if abbreviate \
+            else self._compare_output.local_hash
+        color = Colors.VERSION_CURRENT \
+            if self._is_local_current_with_manifest \
+            else Colors.VERSION_DEFAULT
+        return color + local_hash + Colors.RESET
+
+    def get_color_manifest_version(self, abbreviate):
+        version = self._manifest_version
+        if version is None:
+            return ''
+        if abbreviate and self._manifest_is_hash:
+            version = version[:HASH_MAX_LENGTH]
+        color = Colors.VERSION_CURRENT \
+            if self._is_local_current_with_manifest \
+            else Colors.VERSION_DIFFERS
+        return color + version + Colors.RESET
+
+    def get_color_remote_version(self, abbreviate):
+        remote_hash = self._remote_hash_short if abbreviate \
+            else self._compare_output.remote_hash
+        if remote_hash is None:
+            return ''
+        return Colors.REMOTE + remote_hash + Colors.RESET
+
+    def _build_color_row(self, abbreviate):
+        return [
+            self.get_color_repo_status(),
+            self._path,
+            self.get_color_branch(),
+            self.get_color_track(),
+            self.get_color_local_version(abbreviate),
+            self.get_color_manifest_version(abbreviate),
+            self.get_color_remote_version(abbreviate),
+        ]
+
+
+class MissingManifestEntry(ICompareTableEntry):
+
+    def __init__(self, path, manifest_version):
+        self._path = path
+        self._row_cache = {}
+        self._manifest_version = \
+            str(manifest_version) if manifest_version is not None else ''
+
+    def _build_color_row(self, abbreviate):
+        version = self._manifest_version
+        if abbreviate and is_probably_a_hash(version):
+            version = version[:HASH_MAX_LENGTH]
+        return [
+            _MISSING_STR,
+            self._path,
+            '', '', '',
+            Colors.MISSING + version + Colors.RESET if version else '',
+            '',
+        ]
+
+
+class ErrorEntry(ICompareTableEntry):
+
+    def __init__(self, path, manifest_version, result):
+        self._path = path
+        self._row_cache = {}
+        self._manifest_version = \
+            str(manifest_version) if manifest_version is not None else ''
+        self._unsupported = result['returncode'] == NotImplemented
+        output = result['output'] or ''
+        self._message = output.splitlines()[0] if output else ''
+
+    def _build_color_row(self, abbreviate):
+        if self._unsupported:
+            status = _UNSUPPORTED_STR
+            message_color = Colors.UNSUPPORTED
+        else:
+            status = _ERROR_STR
+            message_color = Colors.ERROR
+        return [
+            status,
+            self._path,
+            '', '',
+            message_color + self._message + Colors.RESET
+            if self._message else '',
+            self._manifest_version,
+            '',
+        ]
+
+
+class CompareTable(object):
+
+    def __init__(self, entries, only_changed=False):
+        if only_changed:
+            entries = {
+                path: entry for path, entry in entries.items()
+                if entry.is_significant()}
+        self._sorted_paths = sorted(entries)
+        self._display_width = self._get_default_display_width()
+
+        # a single width pass over the colorless cells replaces rebuilding
+        # the whole table once per hiding attempt
+        color_rows = [
+            entries[path].get_color_row() for path in self._sorted_paths]
+        widths = self._get_column_widths(
+            color_rows, ICompareTableEntry.HEADERS)
+
+        abbreviate = False
+        table_width = self._table_width(widths)
+        if table_width > self._display_width:
+            # hashes are the widest cells by far, retry with them shortened
+            abbreviate = True
+            color_rows = [
+                entries[path].get_color_row(abbreviate=True)
+                for path in self._sorted_paths]
+            widths = self._get_column_widths(
+                color_rows, ICompareTableEntry.HEADERS)
+            table_width = self._table_width(widths)
+
+        # hiding a column only subtracts its width and separator from the
+        # running total, no re-measuring required
+        cols_to_hide = 0
+        full_widths = widths
+        while (
+            table_width > self._display_width and
+            cols_to_hide < ICompareTableEntry.MAX_HIDE_COLUMNS
+        ):
+            index = ICompareTableEntry.HIDE_ORDER_INDICES[cols_to_hide]
+            table_width -= full_widths[index] + 3
+            cols_to_hide += 1
+
+        if cols_to_hide:
+            widths = ICompareTableEntry._hide_n_columns(
+                list(full_widths), cols_to_hide)
+            color_rows = [
+                entries[path].get_color_row(cols_to_hide, abbreviate)
+                for path in self._sorted_paths]
+        self._headers = ICompareTableEntry.get_headers(cols_to_hide)
+        self._widths = widths
+        self._rows = color_rows
+        self._total_width = table_width
+
+    @staticmethod
+    def _get_column_widths(rows, headers):
+        widths = [len(header) for header in headers]
+        for row in rows:
+            for index, (_, cell_width) in enumerate(row):
+                widths[index] = max(widths[index], cell_width)
+        return widths
+
+    @staticmethod
+    def _table_width(widths):
+        # '| ' before the first cell, ' | ' between cells and ' |' after the
+        # last one add up to three characters per column plus one
+        return sum(widths) + 3 * len(widths) + 1
+
+    @staticmethod
+    def _get_default_display_width():
+        try:
+            return os.get_terminal_size().columns
+        except (ValueError, OSError):
+            return 120
+
+    @staticmethod
+    def _wrap_row_with_background_color(row, background):
+        # splice the background parameter into each cell's own escape
+        # sequences instead of wrapping every cell in an extra
+        # background/reset pair, so the terminal parses one merged
+        # sequence where it used to parse three and the background also
+        # survives the per-cell resets
+        bg_param = ';' + background[2:-1] + 'm'
+        return [
+            ANSI_RE.sub(
+                lambda match: match.group(0)[:-1] + bg_param, item)
+            if '\x1b' in item else item
+            for item in row]
+
+    def _format_row(self, row, is_odd_row=False, header=False):
+        if header:
+            # headers are centered, data cells are left aligned
+            cells = [
+                cell.center(width) for cell, width in zip(row, self._widths)]
+        else:
+            cells = [
+                cell + ' ' * (width - cell_width)
+                for (cell, cell_width), width in zip(row, self._widths)]
+        if is_odd_row and Colors.BACKGROUND_ODD:
+            cells = self._wrap_row_with_background_color(
+                cells, Colors.BACKGROUND_ODD)
+            return Colors.BACKGROUND_ODD + '| ' + ' | '.join(cells) + \
+                ' |' + Colors.RESET
+        return '| ' + ' | '.join(cells) + ' |'
+
+    def __str__(self):
+        lines = [self._format_row(self._headers, header=True)]
+        lines.append('-' * min(self._total_width, self._display_width))
+        for index, row in enumerate(self._rows):
+            lines.append(self._format_row(row, is_odd_row=index % 2 == 1))
+        return '\n'.join(lines)
+
+
+def get_manifest_file(path):
+    # scan the directory once and stop at the second match instead of
+    # building the full glob result list for a fixed suffix pattern
+    matches = []
+    with os.scandir(path) as dir_entries:
+        for dir_entry in dir_entries:
+            if dir_entry.name.endswith('.repos') and dir_entry.is_file():
+                matches.append(dir_entry.path)
+                if len(matches) > 1:
+                    break
+    if not matches:
+        raise RuntimeError(
+            "Could not find a '.repos' file in '%s', pass --input" % path)
+    if len(matches) > 1:
+        raise RuntimeError(
+            "Found multiple '.repos' files in '%s', pass --input" % path)
+    return matches[0]
+
+
+def get_manifest_key(path, base_path):
+    # manifest keys are always forward-slash separated, normalize the
+    # derived key so nested repositories also match on Windows where
+    # relpath returns backslash-separated paths
+    return os.path.relpath(path, base_path).replace(os.sep, '/')
+
+
+def filter_compare_output_per_path(results, base_path):
+    # same keys as output_rows so both formats key their results alike,
+    # including a client at the base path itself which maps to '.'
+    return {
+        get_manifest_key(result['client'].path, base_path): result
+        for result in results}
+
+
+def generate_table_entries(manifest_per_path, compare_output_per_path):
+    # flatten the manifest versions once instead of a membership test plus
+    # nested lookup per repository
+    versions = {
+        path: manifest.get('version')
+        for path, manifest in manifest_per_path.items()}
+    entries = {}
+    for path, result in compare_output_per_path.items():
+        in_manifest = path in versions
+        manifest_version = versions.get(path)
+        if 'compare_data' in result:
+            entries[path] = CompareOutputEntry(
+                path, manifest_version,
+                CompareOutput(**result['compare_data']),
+                in_manifest=in_manifest)
+        else:
+            entries[path] = ErrorEntry(path, manifest_version, result)
+    # dict membership is already O(1), no need to copy the keys into a set
+    for path, version in versions.items():
+        if path not in compare_output_per_path:
+            entries[path] = MissingManifestEntry(path, version)
+    return entries
+
+
+def get_status(entry, version):
+    # 'M' missing, 's' not supported and 'E' failed follow the progress
+    # characters of the executor, '=' and '~' state whether the working copy
+    # is on the version listed in the manifest
+    if entry is None:
+        return 'M'
+    if entry['returncode'] == NotImplemented:
+        return 's'
+    if entry['returncode']:
+        return 'E'
+    if entry['output'] == version:
+        return '='
+    # a repository pinned to a hash is checked out detached, match the
+    # manifest version against the local hash like the table does
+    data = entry.get('compare_data')
+    if data is not None and version == data['local_hash']:
+        return '='
+    return '~'
+
+
+def get_row(key, meta, entry):
+    version = str(meta.get('version', ''))
+    output = entry['output'] if entry is not None else ''
+    return {
+        'status': get_status(entry, version),
+        'repository': key,
+        'type': meta['type'],
+        'version': version,
+        'local': output.splitlines()[0] if output else '',
+        'output': output,
+    }
+
+
+def flush_ready_rows(pending, sorted_keys, emitted, output_row):
+    from vcstool.streams import stdout
+    # emit rows in manifest order as soon as they are available, batching
+    # all contiguous ready rows into a single write
+    lines = []
+    while emitted < len(sorted_keys):
+        row = pending[sorted_keys[emitted]]
+        if row is None:
+            break
+        line = output_row(row)
+        if line is not None:
+            lines.append(line)
+        emitted += 1
+    if lines:
+        stdout.write('\n'.join(lines) + '\n')
+    return emitted
+
+
+def show_progress_on(stream, args):
+    return hasattr(stream, 'isatty') and stream.isatty() and not args.debug
+
+
+def output_progress(entry):
+    from vcstool.streams import stderr
+    if entry['returncode'] == NotImplemented:
+        stderr.write('s')
+    elif entry['returncode']:
+        stderr.write('E')
+    else:
+        stderr.write('.')
+    stderr.flush()
+
+
+def output_table(args, repos, jobs):
+    from vcstool.streams import stderr, stdout
+    # the rich table needs all results to fit the terminal width, so it is
+    # buffered and only the progress ticks stream
+    show_progress = show_progress_on(stderr, args)
+
+    any_error = False
+    results = []
+    for entry in execute_jobs_iter(
+            jobs, number_of_workers=args.workers, debug_jobs=args.debug):
+        if entry['returncode']:
+            any_error = True
+        if show_progress:
+            output_progress(entry)
+        results.append(entry)
+    if show_progress and results:
+        stderr.write('\n')  # finish progress line
+
+    compare_output_per_path = filter_compare_output_per_path(
+        results, args.path)
+    entries = generate_table_entries(repos, compare_output_per_path)
+    table = CompareTable(entries, only_changed=args.only_changed)
+    # one buffered write for the whole report instead of one syscall per
+    # table line and legend
+    stdout.write('%s\n%s\n%s\n' % (
+        table,
+        Legend.get_legend(Legend.STATUS_SYMBOLS),
+        Legend.get_legend(Legend.TRACK_SYMBOLS)))
+    stdout.flush()
+    return 1 if any_error else 0
+
+
+def output_rows(args, repos, clients, jobs):
+    from vcstool.streams import stderr, stdout
+    sorted_keys = sorted(repos)
+    collected_rows = []
+    if args.format == 'plain':
+        def output_row(row):
+            return '\t'.join((
+                row['status'], row['repository'], row['type'],
+                row['version'], row['local']))
+    else:
+        def output_row(row):
+            collected_rows.append(row)
+
+    pending = dict.fromkeys(sorted_keys)
+    client_keys = {
+        get_manifest_key(client.path, args.path) for client in clients}
+    for key, meta in repos.items():
+        if key not in client_keys:
+            pending[key] = get_row(key, meta, None)
+    emitted = flush_ready_rows(pending, sorted_keys, 0, output_row)
+
+    # the plain format streams its rows which doubles as progress, only the
+    # buffered json format shows progress ticks and only when somebody is
+    # watching on an attached terminal
+    show_progress = args.format == 'json' and show_progress_on(stderr, args)
+
+    any_error = False
+    # without any working copies all rows are already flushed as missing and
+    # there is no point in spinning up the worker pool
+    if jobs:
+        for entry in execute_jobs_iter(
+                jobs, number_of_workers=args.workers,
+                debug_jobs=args.debug):
+            if entry['returncode']:
+                any_error = True
+            if show_progress:
+                output_progress(entry)
+            # same keys as for client_keys above so every result matches
+            # its manifest row without rebuilding path prefixes
+            key = get_manifest_key(entry['client'].path, args.path)
+            if key not in pending:
+                continue
+            pending[key] = get_row(key, repos[key], entry)
+            emitted = flush_ready_rows(
+                pending, sorted_keys, emitted, output_row)
+        if show_progress:
+            stderr.write('\n')  # finish progress line
+
+    # rows which never got a matching result are reported as missing
+    for key in sorted_keys[emitted:]:
+        if pending[key] is None:
+            pending[key] = get_row(key, repos[key], None)
+    flush_ready_rows(pending, sorted_keys, emitted, output_row)
+    if args.format == 'json':
+        print(json.dumps(collected_rows), file=stdout)
+
+    return 1 if any_error else 0
+
+
+def main(args=None, stdout=None, stderr=None):
+    set_streams(stdout=stdout, stderr=stderr)
+    from vcstool.streams import stderr as err_stream
+    from vcstool.streams import stdout as out_stream
+
+    parser = get_parser()
+    args = parser.parse_args(args)
+
+    command = CompareCommand(args)
+    # crawl the working copies in the background while the manifest is being
+    # read and parsed, the two only touch disjoint resources
+    with ThreadPoolExecutor(max_workers=1) as crawl_executor:
+        crawl_future = crawl_executor.submit(
+            find_repositories, command.paths, nested=command.nested,
+            number_of_workers=args.workers)
+        try:
+            input_ = args.input
+            if input_ is None:
+                input_ = open(get_manifest_file(args.path))
+            repos = get_repositories(input_)
+        except (OSError, RuntimeError) as e:
+            print(ansi('redf') + str(e) + ansi('reset'), file=err_stream)
+            return 1
+        clients = crawl_future.result()
+
+    if not repos and not clients:
+        # nothing to compare, skip table and worker pool setup entirely
+        if args.format == 'json':
+            print(json.dumps([]), file=out_stream)
+        return 0
+
+    if command.output_repos:
+        output_repositories(clients)
+    jobs = generate_jobs(clients, command)
+
+    if args.format == 'table':
+        return output_table(args, repos, jobs)
+    return output_rows(args, repos, clients, jobs)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -17,6 +17,12 @@ import yaml
 from .command import add_common_arguments
 from .command import Command
 
+try:
+    # prefer the libyaml based parser when PyYAML was built with it
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 
 class ImportCommand(Command):
 
@@ -75,7 +81,9 @@ def file_or_url_type(value):
 
 def get_repositories(yaml_file):
     try:
-        root = yaml.safe_load(yaml_file)
+        # read the whole document in one go instead of letting the parser
+        # stream through the file object
+        root = yaml.load(yaml_file.read(), Loader=SafeLoader)
     except yaml.YAMLError as e:
         raise RuntimeError('Input data is not valid yaml format: %s' % e)
 
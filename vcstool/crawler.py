@@ -1,21 +1,24 @@
+from concurrent.futures import ThreadPoolExecutor
 import os
+import threading
 
 from . import vcstool_clients
 
 
-def find_repositories(paths, nested=False):
+def find_repositories(paths, nested=False, number_of_workers=1):
+    if number_of_workers > 1:
+        return _find_repositories_parallel(
+            paths, nested=nested, number_of_workers=number_of_workers)
     repos = []
-    visited = []
+    visited = set()
     for path in paths:
         _find_repositories(path, repos, visited, nested=nested)
     return repos
 
 
-def _find_repositories(path, repos, visited, nested=False):
-    abs_path = os.path.abspath(path)
-    if abs_path in visited:
+def _find_repositories(path, repos, visited, nested=False, lock=None):
+    if not _visit(visited, os.path.abspath(path), lock=lock):
         return
-    visited.append(abs_path)
 
     client = get_vcs_client(path)
     if client:
@@ -23,15 +26,67 @@ def _find_repositories(path, repos, visited, nested=False):
         if not nested:
             return
 
+    for subpath in _list_subdirectories(path):
+        _find_repositories(subpath, repos, visited, nested=nested, lock=lock)
+
+
+def _find_repositories_parallel(paths, nested=False, number_of_workers=2):
+    repos = []
+    visited = set()
+    lock = threading.Lock()
+
+    # expand each starting path into one work item per subdirectory so that
+    # the I/O bound directory stats of independent subtrees can overlap
+    work_items = []
+    for path in paths:
+        if not _visit(visited, os.path.abspath(path), lock=lock):
+            continue
+        client = get_vcs_client(path)
+        if client:
+            repos.append(client)
+            if not nested:
+                continue
+        work_items += _list_subdirectories(path)
+
+    def crawl(path):
+        sub_repos = []
+        _find_repositories(path, sub_repos, visited, nested=nested, lock=lock)
+        return sub_repos
+
+    with ThreadPoolExecutor(max_workers=number_of_workers) as executor:
+        for sub_repos in executor.map(crawl, work_items):
+            repos += sub_repos
+
+    # keep the result deterministic independent of the completion order
+    repos.sort(key=lambda client: client.path)
+    return repos
+
+
+def _list_subdirectories(path):
+    # scandir reuses the stat information from the directory read instead of
+    # issuing one stat syscall per entry like listdir + isdir
     try:
-        listdir = os.listdir(path)
+        with os.scandir(path) as entries:
+            return sorted(
+                entry.path for entry in entries
+                if entry.is_dir(follow_symlinks=False))
     except OSError:
-        listdir = []
-    for name in sorted(listdir):
-        subpath = os.path.join(path, name)
-        if not os.path.isdir(subpath):
-            continue
-        _find_repositories(subpath, repos, visited, nested=nested)
+        return []
+
+
+def _visit(visited, abs_path, lock=None):
+    # check and mark the path in one step so that concurrent crawls do not
+    # report the same repository twice
+    if lock is None:
+        if abs_path in visited:
+            return False
+        visited.add(abs_path)
+        return True
+    with lock:
+        if abs_path in visited:
+            return False
+        visited.add(abs_path)
+        return True
 
 
 def get_vcs_client(path):
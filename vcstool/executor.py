@@ -24,10 +24,10 @@ def fix_output_path(path):
 def output_repositories(clients):
     from vcstool.streams import stdout
     ordered_clients = {client.path: client for client in clients}
-    for k in sorted(ordered_clients.keys()):
-        client = ordered_clients[k]
+    # paths are unique keys so the clients never take part in the comparison
+    for path, client in sorted(ordered_clients.items()):
         print(
-            '%s (%s)' % (fix_output_path(k), client.__class__.type),
+            '%s (%s)' % (fix_output_path(path), client.__class__.type),
             file=stdout)
 
 
@@ -81,16 +81,36 @@ def get_ready_job(jobs):
 def execute_jobs(
     jobs, show_progress=False, number_of_workers=10, debug_jobs=False
 ):
-    global windows_force_posix
     from vcstool.streams import stdout
+    results = []
+    for result in execute_jobs_iter(
+            jobs, number_of_workers=number_of_workers, debug_jobs=debug_jobs):
+        if show_progress and len(jobs) > 1:
+            if result['returncode'] == NotImplemented:
+                stdout.write('s')
+            elif result['returncode']:
+                stdout.write('E')
+            else:
+                stdout.write('.')
+            if debug_jobs:
+                stdout.write('\n')
+            stdout.flush()
+        results.append(result)
+    if show_progress and len(jobs) > 1 and not debug_jobs:
+        print('', file=stdout)  # finish progress line
+    return results
+
+
+def execute_jobs_iter(jobs, number_of_workers=10, debug_jobs=False):
+    # same scheduling as execute_jobs but yields each result as soon as the
+    # corresponding job has finished
+    global windows_force_posix
     if debug_jobs:
         logger.setLevel(logging.DEBUG)
 
     if windows_force_posix:
         logger.debug('force POSIX paths on Windows')
 
-    results = []
-
     job_queue = Queue()
     result_queue = Queue()
 
@@ -115,44 +135,35 @@ def execute_jobs(
     # start all workers
     [w.start() for w in workers]
 
-    # collect results
-    while len(results) < len(jobs):
-        (job, result) = result_queue.get()
-        logger.debug("finished '%s'" % job['client'].path)
-        running_job_paths.remove(result['job']['client'].path)
-        if show_progress and len(jobs) > 1:
-            if result['returncode'] == NotImplemented:
-                stdout.write('s')
-            elif result['returncode']:
-                stdout.write('E')
-            else:
-                stdout.write('.')
-            if debug_jobs:
-                stdout.write('\n')
-            stdout.flush()
-        result.update(job)
-        results.append(result)
-        if pending_jobs:
-            for pending_job in pending_jobs:
-                pending_job.get('depends', set()).discard(job['client'].path)
-            while job_queue.qsize() < len(workers):
-                job = get_ready_job(pending_jobs)
-                if not job:
-                    break
-                running_job_paths.append(job['client'].path)
-                logger.debug("started '%s'" % job['client'].path)
-                job_queue.put(job)
-            assert running_job_paths
-        if running_job_paths:
-            logger.debug('ongoing ' + str(running_job_paths))
-    if show_progress and len(jobs) > 1 and not debug_jobs:
-        print('', file=stdout)  # finish progress line
-
-    # join all workers
-    for w in workers:
-        w.done = True
-    [w.join() for w in workers]
-    return results
+    # yield results as they become available
+    count = 0
+    try:
+        while count < len(jobs):
+            (job, result) = result_queue.get()
+            logger.debug("finished '%s'" % job['client'].path)
+            running_job_paths.remove(result['job']['client'].path)
+            result.update(job)
+            count += 1
+            if pending_jobs:
+                for pending_job in pending_jobs:
+                    pending_job.get('depends', set()).discard(
+                        job['client'].path)
+                while job_queue.qsize() < len(workers):
+                    job = get_ready_job(pending_jobs)
+                    if not job:
+                        break
+                    running_job_paths.append(job['client'].path)
+                    logger.debug("started '%s'" % job['client'].path)
+                    job_queue.put(job)
+                assert running_job_paths
+            if running_job_paths:
+                logger.debug('ongoing ' + str(running_job_paths))
+            yield result
+    finally:
+        # join all workers
+        for w in workers:
+            w.done = True
+        [w.join() for w in workers]
 
 
 class Worker(threading.Thread):
@@ -266,6 +277,9 @@ USE_COLOR = hasattr(sys.stdout, 'isatty') and sys.stdout.isatty()
 # disable color on Windows except if ConEmuANSI is explicitly enabled
 if os.name == 'nt' and os.environ.get('ConEmuANSI', None) != 'ON':
     USE_COLOR = False
+# honor the NO_COLOR convention, any non-empty value disables color
+if os.environ.get('NO_COLOR'):
+    USE_COLOR = False
 
 
 def ansi(keyword):
@@ -275,7 +289,11 @@ def ansi(keyword):
         'bluef': '\033[34m',
         'boldon': '\033[1m',
         'boldoff': '\033[22m',
+        'brightblackb': '\033[100m',
+        'brightblackf': '\033[90m',
         'cyanf': '\033[36m',
+        'greenf': '\033[32m',
+        'magentaf': '\033[35m',
         'redf': '\033[31m',
         'reset': '\033[0m',
         'yellowf': '\033[33m',